@@ -0,0 +1,238 @@
+from typing import Any, Callable
+from tinypy.parser import (
+    BINARY_OPS,
+    COERCING_OPS,
+    AssignStmt,
+    BinaryExpr,
+    BlockStmt,
+    CallExpr,
+    CommentStmt,
+    Expr,
+    ExprStmt,
+    FunctionStmt,
+    GroupingExpr,
+    IfStmt,
+    Literal,
+    PrintStmt,
+    ReturnStmt,
+    Stmt,
+    Var,
+    VarStmt,
+    Visitor,
+)
+from tinypy.tokenizer import TokenKind
+
+
+def op_name(kind: TokenKind) -> str:
+    return f"op_{kind.name.lower()}"
+
+
+def check_undefined(values: dict[str, Any], name: str):
+    if name in values:
+        raise Exception(f"{name} has already been defined")
+
+
+def check_defined(values: dict[str, Any], name: str):
+    try:
+        values[name]
+    except KeyError:
+        raise Exception(f"Variable {name} is not defined") from None
+
+
+# NOTE: everything generated code can reference, generated code never sees the tinypy variables directly
+NAMESPACE: dict[str, Any] = {op_name(kind): op for kind, op in COERCING_OPS.items()} | {
+    "check_undefined": check_undefined,
+    "check_defined": check_defined,
+}
+
+
+# NOTE: variables are read out of a `values` mapping rather than emitted as bare names so tinypy identifiers
+# that happen to be Python keywords (`in`, `class`, ...) can't break the generated source
+class ExprCompiler(Visitor):
+    def __init__(self):
+        self.consts: dict[str, Any] = {}
+
+    def emit(self, expr: Expr) -> str:
+        return expr.accept(self)
+
+    # NOTE: literals are bound in the namespace rather than spliced in with `repr` which isn't valid source for
+    # every value (`inf`, `nan`)
+    def visit_literal(self, expr: Literal):
+        name = f"const_{len(self.consts)}"
+        self.consts[name] = expr.value
+        return name
+
+    def visit_grouping_expr(self, expr: GroupingExpr):
+        return self.emit(expr.expr)
+
+    def visit_binary_expr(self, expr: BinaryExpr):
+        left = self.emit(expr.left)
+        right = self.emit(expr.right)
+        kind = expr.op.kind
+
+        # NOTE: both sides are known not to be strings so Python's own operator has the same meaning
+        if expr.handler is BINARY_OPS[kind]:
+            return f"({left} {kind} {right})"
+
+        return f"{op_name(kind)}({left}, {right})"
+
+    def visit_var(self, expr: Var):
+        return f"values[{expr.name.value!r}]"
+
+
+# NOTE: returns None for trees using anything other than literals, variables and binary operators
+def compile_expr(expr: Expr) -> Callable[[Any], Any] | None:
+    compiler = ExprCompiler()
+    try:
+        source = compiler.emit(expr)
+    except NotImplementedError:
+        return None
+
+    code = compile(f"lambda values: {source}", "<tinypy>", "eval")
+    return eval(code, NAMESPACE | compiler.consts)
+
+
+# NOTE: statements go through the same `values` mapping as the tree-walking interpreter and calls go back through
+# the interpreter, so a compiled function behaves exactly like the interpreted one
+class FunctionCompiler(ExprCompiler):
+    def __init__(self):
+        super().__init__()
+        self.lines: list[str] = []
+        self.depth = 1
+
+    def line(self, text: str):
+        self.lines.append("    " * self.depth + text)
+
+    def block(self, stmt: Stmt):
+        self.depth += 1
+        start = len(self.lines)
+        stmt.accept(self)
+        if len(self.lines) == start:
+            self.line("pass")
+        self.depth -= 1
+
+    def visit_call_expr(self, expr: CallExpr):
+        args = "".join(f", {self.emit(arg)}" for arg in expr.arguments)
+        return f"call({expr.callee.value!r}{args})"
+
+    def visit_expr_stmt(self, stmt: ExprStmt):
+        self.line(self.emit(stmt.expr))
+
+    def visit_print_stmt(self, stmt: PrintStmt):
+        self.line(f"print({self.emit(stmt.expr)})")
+
+    # NOTE: like the interpreter the name is checked before the value is evaluated, a call in the value could print
+    def visit_var_stmt(self, stmt: VarStmt):
+        name = stmt.name.value
+        self.line(f"check_undefined(values, {name!r})")
+        self.line(f"values[{name!r}] = {self.emit(stmt.expr)}")
+
+    def visit_assign_stmt(self, stmt: AssignStmt):
+        name = stmt.name.value
+        self.line(f"check_defined(values, {name!r})")
+        self.line(f"values[{name!r}] = {self.emit(stmt.value)}")
+
+    def visit_if_stmt(self, stmt: IfStmt):
+        self.line(f"if {self.emit(stmt.cond)}:")
+        self.block(stmt.if_branch)
+        if stmt.else_branch is not None:
+            self.line("else:")
+            self.block(stmt.else_branch)
+
+    def visit_block_stmt(self, stmt: BlockStmt):
+        for inner in stmt.stmts:
+            inner.accept(self)
+
+    def visit_comment_stmt(self, stmt: CommentStmt):
+        pass
+
+    def visit_return_stmt(self, stmt: ReturnStmt):
+        value = "None" if stmt.value is None else self.emit(stmt.value)
+        self.line(f"return {value}")
+
+
+def contains_return(stmt: Stmt) -> bool:
+    if isinstance(stmt, ReturnStmt):
+        return True
+    elif isinstance(stmt, IfStmt):
+        return contains_return(stmt.if_branch) or (
+            stmt.else_branch is not None and contains_return(stmt.else_branch)
+        )
+    elif isinstance(stmt, BlockStmt):
+        return any(contains_return(inner) for inner in stmt.stmts)
+    else:
+        return False
+
+
+# NOTE: the interpreter doesn't stop at a `return` (it just records the value) so a Python `return` only means the
+# same thing when every path ends in one and nothing comes after it
+def tail_returns(block: BlockStmt) -> bool:
+    stmts = [stmt for stmt in block.stmts if not isinstance(stmt, CommentStmt)]
+
+    if len(stmts) == 0 or any(contains_return(stmt) for stmt in stmts[:-1]):
+        return False
+
+    last = stmts[-1]
+
+    if isinstance(last, ReturnStmt):
+        return True
+    elif isinstance(last, IfStmt) and last.else_branch is not None:
+        return tail_returns(last.if_branch) and tail_returns(last.else_branch)
+    else:
+        return False
+
+
+# NOTE: returns None for functions we can't compile faithfully, the result is called as `compiled(call, values)`
+# with `values` holding the bound parameters
+def compile_function(function: FunctionStmt) -> Callable[..., Any] | None:
+    if not tail_returns(function.body):
+        return None
+
+    compiler = FunctionCompiler()
+    try:
+        function.body.accept(compiler)
+    except NotImplementedError:
+        return None
+
+    # NOTE: the tinypy name could be a Python keyword or shadow one of the NAMESPACE helpers so it isn't used
+    body = "\n".join(compiler.lines)
+    source = f"def function(call, values):\n{body}\n"
+
+    namespace = NAMESPACE | compiler.consts
+    exec(compile(source, "<tinypy>", "exec"), namespace)
+    return namespace["function"]
+
+
+# NOTE: top level statements compile the same way as a function body, a `def` just hands the FunctionStmt back to the
+# interpreter which still owns calls
+class ScriptCompiler(FunctionCompiler):
+    def __init__(self):
+        super().__init__()
+        self.functions: list[FunctionStmt] = []
+
+    def visit_function_stmt(self, stmt: FunctionStmt):
+        self.line(f"define(functions[{len(self.functions)}])")
+        self.functions.append(stmt)
+
+
+# NOTE: returns None for programs we can't compile faithfully, the result is called as `script(call, define, values)`
+# with `values` holding the globals
+def compile_script(stmts: list[Stmt]) -> Callable[..., None] | None:
+    # NOTE: a top level `return` doesn't stop the interpreter so it can't become a Python `return`
+    if any(contains_return(stmt) for stmt in stmts):
+        return None
+
+    compiler = ScriptCompiler()
+    try:
+        for stmt in stmts:
+            stmt.accept(compiler)
+    except NotImplementedError:
+        return None
+
+    body = "\n".join(compiler.lines) or "    pass"
+    source = f"def script(call, define, values):\n{body}\n"
+
+    namespace = NAMESPACE | compiler.consts
+    namespace["functions"] = compiler.functions
+    exec(compile(source, "<tinypy>", "exec"), namespace)
+    return namespace["script"]
@@ -0,0 +1,209 @@
+from array import array
+from functools import lru_cache
+from typing import Any
+from tinypy.parser import (
+    BINARY_OPS,
+    AssignStmt,
+    BinaryExpr,
+    BlockStmt,
+    CommentStmt,
+    Expr,
+    ExprStmt,
+    GroupingExpr,
+    IfStmt,
+    Literal,
+    Parser,
+    PrintStmt,
+    Stmt,
+    Var,
+    VarStmt,
+    Visitor,
+)
+from tinypy.tokenizer import TokenKind, tokenize
+
+# NOTE: every instruction is an (opcode, argument) pair of 32 bit words, the argument is unused by some opcodes
+LOAD_CONST = 0
+LOAD_VAR = 1
+ADD = 2
+SUB = 3
+MUL = 4
+DIV = 5
+# NOTE: calls the handler stored in `consts[arg]`, used whenever the operand types aren't known to be numbers
+BINARY = 6
+PRINT = 7
+POP = 8
+DECLARE = 9
+STORE = 10
+JUMP = 11
+JUMP_IF_FALSE = 12
+# NOTE: superinstructions for arithmetic with a literal right operand (`x + 1`), they apply `consts[arg]` to the top
+# of the stack rather than loading it first
+ADD_CONST = 13
+SUB_CONST = 14
+MUL_CONST = 15
+DIV_CONST = 16
+# NOTE: check `names[arg]` can be declared or assigned, emitted before the value so an error comes before any side
+# effect of evaluating it, DECLARE and STORE then just store
+CHECK_DECLARE = 17
+CHECK_STORE = 18
+
+ARITHMETIC_OPCODES = {
+    TokenKind.PLUS: ADD,
+    TokenKind.MINUS: SUB,
+    TokenKind.STAR: MUL,
+    TokenKind.SLASH: DIV,
+}
+
+CONST_OPCODES = {
+    TokenKind.PLUS: ADD_CONST,
+    TokenKind.MINUS: SUB_CONST,
+    TokenKind.STAR: MUL_CONST,
+    TokenKind.SLASH: DIV_CONST,
+}
+
+
+class Code:
+    __slots__ = ("ops", "consts", "names")
+
+    def __init__(self, ops: array, consts: list[Any], names: list[str]):
+        self.ops = ops
+        self.consts = consts
+        self.names = names
+
+
+# NOTE: only handles straight-line programs with ifs, anything using functions raises NotImplementedError and is
+# left to the tree-walking interpreter
+class Compiler(Visitor):
+    def __init__(self):
+        self.ops = array("I")
+        self.consts: list[Any] = []
+        self.const_indices: dict[tuple[type, Any], int] = {}
+        self.names: list[str] = []
+        self.name_indices: dict[str, int] = {}
+
+    def compile(self, stmts: list[Stmt]) -> Code:
+        for stmt in stmts:
+            stmt.accept(self)
+        return Code(self.ops, self.consts, self.names)
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        self.ops.append(op)
+        self.ops.append(arg)
+        return len(self.ops) - 1
+
+    # NOTE: points a jump emitted earlier at the next instruction
+    def patch(self, position: int):
+        self.ops[position] = len(self.ops)
+
+    # NOTE: each distinct constant (and handler) is stored once, keyed with its type so 1, 1.0 and True stay apart
+    def const(self, value: Any) -> int:
+        # NOTE: 0.0 == -0.0 so zero floats would share a slot, they get one each
+        if type(value) is float and value == 0:
+            self.consts.append(value)
+            return len(self.consts) - 1
+
+        key = (type(value), value)
+        index = self.const_indices.get(key)
+        if index is None:
+            index = self.const_indices[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def name(self, name: str) -> int:
+        index = self.name_indices.get(name)
+        if index is None:
+            index = self.name_indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def visit_literal(self, expr: Literal):
+        self.emit(LOAD_CONST, self.const(expr.value))
+
+    def visit_grouping_expr(self, expr: GroupingExpr):
+        expr.expr.accept(self)
+
+    def visit_binary_expr(self, expr: BinaryExpr):
+        kind = expr.op.kind
+        right = expr.right
+        arithmetic = expr.handler is BINARY_OPS[kind] and kind in ARITHMETIC_OPCODES
+
+        expr.left.accept(self)
+
+        if arithmetic and type(right) is Literal:
+            self.emit(CONST_OPCODES[kind], self.const(right.value))
+            return
+
+        right.accept(self)
+
+        if arithmetic:
+            self.emit(ARITHMETIC_OPCODES[kind])
+        else:
+            self.emit(BINARY, self.const(expr.handler))
+
+    def visit_var(self, expr: Var):
+        self.emit(LOAD_VAR, self.name(expr.name.value))
+
+    def visit_expr_stmt(self, stmt: ExprStmt):
+        stmt.expr.accept(self)
+        self.emit(POP)
+
+    def visit_print_stmt(self, stmt: PrintStmt):
+        stmt.expr.accept(self)
+        self.emit(PRINT)
+
+    def visit_var_stmt(self, stmt: VarStmt):
+        name = self.name(stmt.name.value)
+        self.emit(CHECK_DECLARE, name)
+        stmt.expr.accept(self)
+        self.emit(DECLARE, name)
+
+    def visit_assign_stmt(self, stmt: AssignStmt):
+        name = self.name(stmt.name.value)
+        self.emit(CHECK_STORE, name)
+        stmt.value.accept(self)
+        self.emit(STORE, name)
+
+    def visit_if_stmt(self, stmt: IfStmt):
+        stmt.cond.accept(self)
+        skip_if = self.emit(JUMP_IF_FALSE)
+        stmt.if_branch.accept(self)
+
+        if stmt.else_branch is None:
+            self.patch(skip_if)
+        else:
+            skip_else = self.emit(JUMP)
+            self.patch(skip_if)
+            stmt.else_branch.accept(self)
+            self.patch(skip_else)
+
+    def visit_block_stmt(self, stmt: BlockStmt):
+        for inner in stmt.stmts:
+            inner.accept(self)
+
+    def visit_comment_stmt(self, stmt: CommentStmt):
+        pass
+
+
+# NOTE: returns None for programs the bytecode can't express yet
+def compile_program(stmts: list[Stmt]) -> Code | None:
+    try:
+        return Compiler().compile(stmts)
+    except NotImplementedError:
+        return None
+
+
+# NOTE: an expression compiles to code that leaves its value on the stack
+def compile_expression(expr: Expr) -> Code | None:
+    compiler = Compiler()
+    try:
+        expr.accept(compiler)
+    except NotImplementedError:
+        return None
+    return Code(compiler.ops, compiler.consts, compiler.names)
+
+
+# NOTE: the code only depends on the source text, never on variable values, so repeated evaluations of the same
+# source can skip tokenizing, parsing and compiling
+@lru_cache(maxsize=256)
+def compile_source_expression(source: str) -> Code | None:
+    return compile_expression(Parser(tokenize(source)).expr())
@@ -0,0 +1,259 @@
+from tinypy.codegen import tail_returns
+from tinypy.parser import (
+    BINARY_OPS,
+    COERCING_OPS,
+    STRING_OPS,
+    AssignStmt,
+    BinaryExpr,
+    BlockStmt,
+    CallExpr,
+    CommentStmt,
+    Expr,
+    ExprStmt,
+    FunctionStmt,
+    GroupingExpr,
+    IfStmt,
+    Literal,
+    PrintStmt,
+    ReturnStmt,
+    Stmt,
+    Var,
+    VarStmt,
+    Visitor,
+)
+from tinypy.tokenizer import TokenKind
+
+# NOTE: types are represented by the token kind of their annotation, None means we don't know
+Type = TokenKind | None
+
+# NOTE: None is the global scope, every function gets its own
+Scope = FunctionStmt | None
+
+LITERAL_TYPES: dict[type, TokenKind] = {
+    bool: TokenKind.BOOL,
+    int: TokenKind.INT,
+    float: TokenKind.FLOAT,
+    str: TokenKind.STR,
+}
+
+COMPARISONS = frozenset(
+    {
+        TokenKind.DOUBLE_EQUALS,
+        TokenKind.NOT_EQUALS,
+        TokenKind.LESS,
+        TokenKind.GREATER,
+        TokenKind.LESS_EQUALS,
+        TokenKind.GREATER_EQUALS,
+    }
+)
+
+
+# NOTE: every value a name can be given (declarations and assignments) and every value a function can return,
+# grouped by the scope they happen in
+class ValueCollector(Visitor):
+    def __init__(self):
+        self.scope: Scope = None
+        self.annotations: dict[Scope, dict[str, set[TokenKind]]] = {None: {}}
+        self.values: dict[Scope, list[tuple[str, Expr]]] = {None: []}
+        self.returns: dict[FunctionStmt, list[Expr | None]] = {}
+
+    def collect(self, stmts: list[Stmt]):
+        for stmt in stmts:
+            stmt.accept(self)
+
+    def visit_expr_stmt(self, stmt: ExprStmt):
+        pass
+
+    def visit_print_stmt(self, stmt: PrintStmt):
+        pass
+
+    def visit_var_stmt(self, stmt: VarStmt):
+        name = stmt.name.value
+        annotations = self.annotations[self.scope].setdefault(name, set())
+        annotations.add(stmt.type_annotation.kind)
+        self.values[self.scope].append((name, stmt.expr))
+
+    def visit_assign_stmt(self, stmt: AssignStmt):
+        self.values[self.scope].append((stmt.name.value, stmt.value))
+
+    def visit_if_stmt(self, stmt: IfStmt):
+        stmt.if_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_block_stmt(self, stmt: BlockStmt):
+        for inner in stmt.stmts:
+            inner.accept(self)
+
+    def visit_comment_stmt(self, stmt: CommentStmt):
+        pass
+
+    def visit_function_stmt(self, stmt: FunctionStmt):
+        self.annotations[stmt] = {}
+        self.values[stmt] = []
+        self.returns[stmt] = []
+
+        enclosing = self.scope
+        self.scope = stmt
+        stmt.body.accept(self)
+        self.scope = enclosing
+
+    def visit_return_stmt(self, stmt: ReturnStmt):
+        if self.scope is not None:
+            self.returns[self.scope].append(stmt.value)
+
+
+# NOTE: tinypy never enforces annotations (the last declaration wins and an assignment can change a variable's
+# type) so they are only trusted when every value a name can hold agrees with them. Parameters are never checked
+# and stay unknown. The types are only used to pick operator handlers, no type errors are reported
+class TypeAnnotator(Visitor):
+    def __init__(self):
+        self.scope: Scope = None
+        # NOTE: a function scope only holds its parameters and the names it declares or assigns, everything else
+        # is read from the globals
+        self.types: dict[Scope, dict[str, Type]] = {None: {}}
+        self.return_types: dict[str, Type] = {}
+
+    def annotate(self, stmts: list[Stmt]):
+        collector = ValueCollector()
+        collector.collect(stmts)
+
+        for scope, annotations in collector.annotations.items():
+            self.types[scope] = {
+                name: next(iter(kinds)) if len(kinds) == 1 else None
+                for name, kinds in annotations.items()
+            }
+
+        for function in collector.returns:
+            for name, _ in function.params:
+                self.types[function][name.value] = None
+            # NOTE: a `return` doesn't stop the function (see tail_returns), so a later call can overwrite the value
+            # or the body can fall off the end and give None
+            declared = (
+                function.return_type.kind if tail_returns(function.body) else None
+            )
+            self.return_types[function.name.value] = declared
+
+        # NOTE: a name (or function) becomes unknown as soon as one of its values disagrees, which can change the
+        # type of other values so keep going until nothing changes
+        changed = True
+        while changed:
+            changed = False
+
+            for scope, values in collector.values.items():
+                self.scope = scope
+                types = self.types[scope]
+
+                for name, value in values:
+                    expected = self.lookup(name)
+                    if expected is not None and value.accept(self) is not expected:
+                        types[name] = None
+                        changed = True
+
+                # NOTE: a local declared with the same name as a global reads the global until it's declared
+                if scope is not None:
+                    globals_ = self.types[None]
+                    for name, type_ in types.items():
+                        if type_ is not None and globals_.get(name, type_) is not type_:
+                            types[name] = None
+                            changed = True
+
+            for function, returns in collector.returns.items():
+                self.scope = function
+                name = function.name.value
+                expected = self.return_types[name]
+
+                if expected is None:
+                    continue
+
+                for value in returns:
+                    if value is None or value.accept(self) is not expected:
+                        self.return_types[name] = None
+                        changed = True
+                        break
+
+        self.scope = None
+        for stmt in stmts:
+            stmt.accept(self)
+
+    def lookup(self, name: str) -> Type:
+        if self.scope is not None:
+            types = self.types[self.scope]
+            if name in types:
+                return types[name]
+        return self.types[None].get(name)
+
+    def visit_literal(self, expr: Literal) -> Type:
+        return LITERAL_TYPES.get(type(expr.value))
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> Type:
+        return expr.expr.accept(self)
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> Type:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        kind = expr.op.kind
+
+        if left is None or right is None:
+            expr.handler = COERCING_OPS[kind]
+            return TokenKind.BOOL if kind in COMPARISONS else None
+
+        if left is TokenKind.STR or right is TokenKind.STR:
+            expr.handler = STRING_OPS[kind]
+            return TokenKind.BOOL if kind in COMPARISONS else TokenKind.STR
+
+        expr.handler = BINARY_OPS[kind]
+
+        if kind in COMPARISONS:
+            return TokenKind.BOOL
+        elif kind is TokenKind.SLASH or TokenKind.FLOAT in (left, right):
+            return TokenKind.FLOAT
+        else:
+            return TokenKind.INT
+
+    def visit_var(self, expr: Var) -> Type:
+        return self.lookup(expr.name.value)
+
+    def visit_call_expr(self, expr: CallExpr) -> Type:
+        for arg in expr.arguments:
+            arg.accept(self)
+        return self.return_types.get(expr.callee.value)
+
+    def visit_expr_stmt(self, stmt: ExprStmt):
+        stmt.expr.accept(self)
+
+    def visit_print_stmt(self, stmt: PrintStmt):
+        stmt.expr.accept(self)
+
+    def visit_var_stmt(self, stmt: VarStmt):
+        stmt.expr.accept(self)
+
+    def visit_assign_stmt(self, stmt: AssignStmt):
+        stmt.value.accept(self)
+
+    def visit_if_stmt(self, stmt: IfStmt):
+        stmt.cond.accept(self)
+        stmt.if_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_block_stmt(self, stmt: BlockStmt):
+        for inner in stmt.stmts:
+            inner.accept(self)
+
+    def visit_comment_stmt(self, stmt: CommentStmt):
+        pass
+
+    def visit_function_stmt(self, stmt: FunctionStmt):
+        enclosing = self.scope
+        self.scope = stmt
+        stmt.body.accept(self)
+        self.scope = enclosing
+
+    def visit_return_stmt(self, stmt: ReturnStmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+
+
+def annotate(stmts: list[Stmt]):
+    TypeAnnotator().annotate(stmts)
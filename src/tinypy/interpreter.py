@@ -1,5 +1,5 @@
-from typing import Any
-from tinypy.tokenizer import TokenKind
+from functools import lru_cache
+from typing import Any, Callable, Sequence
 from tinypy.parser import (
     CallExpr,
     IfStmt,
@@ -21,23 +21,66 @@ from tinypy.parser import (
     FunctionStmt,
     ReturnStmt,
 )
+from tinypy.inference import annotate
+from tinypy.codegen import compile_expr, compile_function, compile_script
+from tinypy.compiler import Code, compile_program
+from tinypy.vm import VM
+
+
+# NOTE: a function call's local variables - names that aren't local fall through to the globals
+class Scope(dict[str, Any]):
+    def __init__(self, parent: dict[str, Any]):
+        super().__init__()
+        self.parent = parent
+
+    def __missing__(self, name: str):
+        return self.parent[name]
 
 
 class Interpreter(Visitor):
     def __init__(self):
-        self.values: dict[str, Any] = {}
+        self.globals: dict[str, Any] = {}
+        self.values: dict[str, Any] = self.globals
+        # NOTE: the callers' scopes, innermost last
+        self.frames: list[dict[str, Any]] = []
         self.functions: dict[str, FunctionStmt] = {}
         self.return_value = None
+        # NOTE: arithmetic trees get compiled to Python on their second visit, None marks trees that can't be
+        self.visited: set[BinaryExpr] = set()
+        self.compiled: dict[BinaryExpr, Callable[[dict[str, Any]], Any] | None] = {}
+        # NOTE: look handlers up by node type directly rather than bouncing through `accept`
+        self.dispatch: dict[type[Node], Callable[[Any], Any]] = {
+            Literal: self.visit_literal,
+            GroupingExpr: self.visit_grouping_expr,
+            BinaryExpr: self.visit_binary_expr,
+            Var: self.visit_var,
+            CallExpr: self.visit_call_expr,
+            ExprStmt: self.visit_expr_stmt,
+            PrintStmt: self.visit_print_stmt,
+            VarStmt: self.visit_var_stmt,
+            AssignStmt: self.visit_assign_stmt,
+            IfStmt: self.visit_if_stmt,
+            BlockStmt: self.visit_block_stmt,
+            CommentStmt: self.visit_comment_stmt,
+            FunctionStmt: self.visit_function_stmt,
+            ReturnStmt: self.visit_return_stmt,
+        }
 
     def interpret(self, stmts: list[Stmt]):
         for stmt in stmts:
             self.execute(stmt)
 
+    def run(self, script: Callable[..., None]):
+        try:
+            script(self.call_function, self.define, self.globals)
+        except KeyError as e:
+            raise Exception(f"Variable {e.args[0]} is not defined") from None
+
     def execute(self, stmt: Stmt):
-        stmt.accept(self)
+        self.dispatch[type(stmt)](stmt)
 
     def evaluate(self, expr: Expr):
-        return expr.accept(self)
+        return self.dispatch[type(expr)](expr)
 
     def visit_literal(self, expr: Literal):
         return expr.value
@@ -46,48 +89,37 @@ class Interpreter(Visitor):
         return self.evaluate(expr.expr)
 
     def visit_binary_expr(self, expr: BinaryExpr):
-        left = self.evaluate(expr.left)
-        right = self.evaluate(expr.right)
-
-        kind = expr.op.kind
-
-        # FIXME: must be a better way
-        if isinstance(left, str) or isinstance(right, str):
-            left = str(left)
-            right = str(right)
-
-        if kind == TokenKind.PLUS:
-            return left + right
-        elif kind == TokenKind.MINUS:
-            return left - right
-        elif kind == TokenKind.STAR:
-            return left * right
-        elif kind == TokenKind.SLASH:
-            return left / right
-        elif kind == TokenKind.DOUBLE_EQUALS:
-            return left == right
-        elif kind == TokenKind.NOT_EQUALS:
-            return left != right
-        elif kind == TokenKind.LESS:
-            return left < right
-        elif kind == TokenKind.GREATER:
-            return left > right
-        elif kind == TokenKind.LESS_EQUALS:
-            return left <= right
-        elif kind == TokenKind.GREATER_EQUALS:
-            return left >= right
-        else:
-            raise NotImplementedError(f"Binary operator {kind} not implemented")
-
+        try:
+            compiled = self.compiled[expr]
+        except KeyError:
+            # NOTE: top level code only ever runs once so compiling is only worth it for a tree that comes back
+            # around, i.e. one in a function body
+            if expr in self.visited:
+                compiled = self.compiled[expr] = compile_expr(expr)
+            else:
+                self.visited.add(expr)
+                compiled = None
+
+        if compiled is not None:
+            try:
+                return compiled(self.values)
+            except KeyError as e:
+                raise Exception(f"Variable {e.args[0]} is not defined") from None
+
+        return expr.handler(self.evaluate(expr.left), self.evaluate(expr.right))
+
+    # NOTE: the wrapped expression is dispatched directly rather than through `evaluate`, the wrapper node is kept
+    # because the other passes rely on it to know the value gets thrown away (or printed)
     def visit_expr_stmt(self, stmt: ExprStmt):
-        value = self.evaluate(stmt.expr)
+        expr = stmt.expr
+        self.dispatch[type(expr)](expr)
 
     def visit_print_stmt(self, stmt: PrintStmt):
-        value = self.evaluate(stmt.expr)
-        print(value)
+        expr = stmt.expr
+        print(self.dispatch[type(expr)](expr))
 
     def visit_var_stmt(self, stmt: VarStmt):
-        name = stmt.name.text
+        name = stmt.name.value
 
         if name in self.values:
             raise Exception(f"{name} has already been defined")
@@ -96,20 +128,19 @@ class Interpreter(Visitor):
             self.values[name] = value
 
     def visit_var(self, expr: Var):
-        value = self.values.get(expr.name.value)
-
-        if value is None:
-            raise Exception(f"Variable {expr.name.value} is not defined")
-
-        return value
+        try:
+            return self.values[expr.name.value]
+        except KeyError:
+            raise Exception(f"Variable {expr.name.value} is not defined") from None
 
     # TODO: there's no type checking
     def visit_assign_stmt(self, stmt: AssignStmt):
         name = stmt.name.value
-        curr_value = self.values.get(name)
 
-        if curr_value is None:
-            raise Exception(f"Variable {stmt.name.value} is not defined")
+        try:
+            self.values[name]
+        except KeyError:
+            raise Exception(f"Variable {name} is not defined") from None
 
         value = self.evaluate(stmt.value)
 
@@ -129,9 +160,13 @@ class Interpreter(Visitor):
         pass
 
     def visit_function_stmt(self, stmt: FunctionStmt):
-        name = stmt.name.value
+        self.define(stmt)
+
+    # NOTE: also how compiled scripts declare functions
+    def define(self, function: FunctionStmt):
+        name = function.name.value
         assert name not in self.functions, "Cannot redefine"
-        self.functions[name] = stmt
+        self.functions[name] = function
 
     def visit_call_expr(self, expr: CallExpr):
         name = expr.callee.value
@@ -140,19 +175,44 @@ class Interpreter(Visitor):
 
         args = [self.evaluate(arg) for arg in expr.arguments]
 
+        return self.call(function, args)
+
+    # NOTE: also how compiled function bodies call back into tinypy functions
+    def call_function(self, name: str, *args: Any):
+        function = self.functions.get(name)
+        assert function is not None
+
+        return self.call(function, args)
+
+    def call(self, function: FunctionStmt, args: Sequence[Any]):
         assert len(args) == len(function.params)
 
         # Create new scope for function
-        previous_values = self.values.copy()
+        frame = Scope(self.globals)
 
         # Bind parameters to arguments
         for (param_name, param_type), arg in zip(function.params, args):
-            self.values[param_name.value] = arg
+            frame[param_name.value] = arg
+
+        try:
+            compiled = function.compiled
+        except AttributeError:
+            compiled = function.compiled = compile_function(function)
+
+        if compiled is not None:
+            try:
+                self.return_value = compiled(self.call_function, frame)
+            except KeyError as e:
+                raise Exception(f"Variable {e.args[0]} is not defined") from None
+            return self.return_value
+
+        self.frames.append(self.values)
+        self.values = frame
 
         self.return_value = None
         self.execute(function.body)
 
-        self.values = previous_values
+        self.values = self.frames.pop()
 
         return self.return_value
 
@@ -164,7 +224,29 @@ class Interpreter(Visitor):
         return self.return_value
 
 
-def interpret(source: str):
+# NOTE: everything here depends only on the source text so running the same source again (the REPL, tests) reuses it
+@lru_cache(maxsize=256)
+def prepare(source: str) -> tuple[list[Stmt], Code | None, Callable[..., None] | None]:
     stmts = parse(source)
+    annotate(stmts)
+
+    # NOTE: programs without functions run on the bytecode VM, the rest are compiled to Python where possible and
+    # only walk the tree as a last resort
+    code = compile_program(stmts)
+    script = compile_script(stmts) if code is None else None
+
+    return stmts, code, script
+
+
+def interpret(source: str):
+    stmts, code, script = prepare(source)
+
+    if code is not None:
+        VM().run(code)
+        return
+
     interpreter = Interpreter()
-    interpreter.interpret(stmts)
+    if script is not None:
+        interpreter.run(script)
+    else:
+        interpreter.interpret(stmts)
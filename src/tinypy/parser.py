@@ -1,20 +1,95 @@
-from abc import ABC, abstractmethod
-from typing import Any
+import operator
+from typing import Any, Callable
 from tinypy.tokenizer import Token, TokenKind, tokenize
 
 
-class Node(ABC):
-    @abstractmethod
-    def accept(self, visitor: "Visitor") -> Any: ...
+BINARY_OPS: dict[TokenKind, Callable[[Any, Any], Any]] = {
+    TokenKind.PLUS: operator.add,
+    TokenKind.MINUS: operator.sub,
+    TokenKind.STAR: operator.mul,
+    TokenKind.SLASH: operator.truediv,
+    TokenKind.DOUBLE_EQUALS: operator.eq,
+    TokenKind.NOT_EQUALS: operator.ne,
+    TokenKind.LESS: operator.lt,
+    TokenKind.GREATER: operator.gt,
+    TokenKind.LESS_EQUALS: operator.le,
+    TokenKind.GREATER_EQUALS: operator.ge,
+}
+
+
+def coerce_strings(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    # NOTE: if either side is a str both sides get stringified
+    def binary(left, right):
+        if isinstance(left, str) or isinstance(right, str):
+            return op(str(left), str(right))
+        return op(left, right)
+
+    return binary
+
+
+def stringify(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    def binary(left, right):
+        return op(str(left), str(right))
+
+    return binary
+
+
+# NOTE: COERCING_OPS is always correct, STRING_OPS/BINARY_OPS are for when the operand types are known up front
+COERCING_OPS = {kind: coerce_strings(op) for kind, op in BINARY_OPS.items()}
+STRING_OPS = {kind: stringify(op) for kind, op in BINARY_OPS.items()}
+
+
+# NOTE: the kinds the parser checks most often, a module global is a cheaper load than an attribute of the enum class
+EOF = TokenKind.EOF
+NEWLINE = TokenKind.NEWLINE
+IDENTIFIER = TokenKind.IDENTIFIER
+LEFT_PAREN = TokenKind.LEFT_PAREN
+RIGHT_PAREN = TokenKind.RIGHT_PAREN
+EQUALS = TokenKind.EQUALS
+COLON = TokenKind.COLON
+DEDENT = TokenKind.DEDENT
+
+# NOTE: binding strength of each binary operator, anything missing binds at 0 which ends an expression
+PRECEDENCE: dict[TokenKind, int] = {
+    TokenKind.DOUBLE_EQUALS: 1,
+    TokenKind.NOT_EQUALS: 1,
+    TokenKind.GREATER: 2,
+    TokenKind.GREATER_EQUALS: 2,
+    TokenKind.LESS: 2,
+    TokenKind.LESS_EQUALS: 2,
+    TokenKind.PLUS: 3,
+    TokenKind.MINUS: 3,
+    TokenKind.STAR: 4,
+    TokenKind.SLASH: 4,
+}
+LITERAL_KINDS = frozenset(
+    {TokenKind.INT, TokenKind.FLOAT, TokenKind.BOOL, TokenKind.STR}
+)
+TYPE_KINDS = LITERAL_KINDS
+
+MAX_INTERNED_STR = 64
+
+
+# NOTE: every node declares __slots__ (and the bases an empty one) so instances don't carry a __dict__, and it's a
+# plain class rather than an ABC so isinstance checks against nodes skip ABCMeta.__instancecheck__
+class Node:
+    __slots__ = ()
+
+    def accept(self, visitor: "Visitor") -> Any:
+        raise NotImplementedError()
 
 
-class Expr(Node): ...
+class Expr(Node):
+    __slots__ = ()
 
 
-class Stmt(Node): ...
+class Stmt(Node):
+    __slots__ = ()
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: object):
         self.value = value
 
@@ -26,6 +101,8 @@ class Literal(Expr):
 
 
 class GroupingExpr(Expr):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Node):
         self.expr = expr
 
@@ -37,10 +114,15 @@ class GroupingExpr(Expr):
 
 
 class BinaryExpr(Expr):
+    __slots__ = ("left", "op", "right", "handler")
+
     def __init__(self, left: Node, op: Token, right: Node):
         self.left = left
         self.op = op
         self.right = right
+        # NOTE: an inline cache of the operator to call, the type annotation pass swaps in one specialised to the
+        # operand types when it can
+        self.handler: Callable[[Any, Any], Any] = COERCING_OPS[op.kind]
 
     def accept(self, visitor: "Visitor") -> Any:
         return visitor.visit_binary_expr(self)
@@ -50,6 +132,8 @@ class BinaryExpr(Expr):
 
 
 class ExprStmt(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
@@ -61,6 +145,8 @@ class ExprStmt(Stmt):
 
 
 class PrintStmt(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
@@ -72,6 +158,8 @@ class PrintStmt(Stmt):
 
 
 class VarStmt(Stmt):
+    __slots__ = ("name", "type_annotation", "expr")
+
     def __init__(self, name: Token, type_annotation: Token, expr: Expr):
         self.name = name
         self.type_annotation = type_annotation
@@ -85,6 +173,8 @@ class VarStmt(Stmt):
 
 
 class IfStmt(Stmt):
+    __slots__ = ("cond", "if_branch", "else_branch")
+
     def __init__(self, cond: Expr, if_branch: Stmt, else_branch: Stmt | None):
         self.cond = cond
         self.if_branch = if_branch
@@ -98,6 +188,8 @@ class IfStmt(Stmt):
 
 
 class BlockStmt(Stmt):
+    __slots__ = ("stmts",)
+
     def __init__(self, stmts: list[Stmt]):
         self.stmts = stmts
 
@@ -109,6 +201,8 @@ class BlockStmt(Stmt):
 
 
 class CommentStmt(Stmt):
+    __slots__ = ("comment",)
+
     def __init__(self, comment: Token):
         self.comment = comment
 
@@ -117,6 +211,8 @@ class CommentStmt(Stmt):
 
 
 class Var(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, name: Token):
         self.name = name
 
@@ -128,6 +224,8 @@ class Var(Expr):
 
 
 class AssignStmt(Stmt):
+    __slots__ = ("name", "value")
+
     def __init__(self, name: Token, value: Expr) -> None:
         self.name = name
         self.value = value
@@ -139,7 +237,11 @@ class AssignStmt(Stmt):
         return f"{self.name.value} = {self.value}"
 
 
+# NOTE: `compiled` is left unset until the interpreter first calls the function, then it holds the compiled body (or
+# None if it can't be compiled) so it survives across runs of the same parsed program
 class FunctionStmt(Stmt):
+    __slots__ = ("name", "params", "return_type", "body", "compiled")
+
     def __init__(
         self,
         name: Token,
@@ -163,6 +265,8 @@ class FunctionStmt(Stmt):
 
 
 class CallExpr(Expr):
+    __slots__ = ("callee", "arguments")
+
     def __init__(self, callee: Token, arguments: list[Expr]):
         self.callee = callee
         self.arguments = arguments
@@ -176,6 +280,8 @@ class CallExpr(Expr):
 
 
 class ReturnStmt(Stmt):
+    __slots__ = ("keyword", "value")
+
     def __init__(self, keyword: Token, value: Expr | None):
         self.keyword = keyword
         self.value = value
@@ -232,194 +338,221 @@ class Visitor:
         raise NotImplementedError()
 
 
+# NOTE: the grammar, every rule is picked from at most the next two tokens so there's no backtracking (and nothing a
+# packrat cache or a generated table-driven parser would buy us)
+#
+#   program    = { var_stmt } EOF
+#   var_stmt   = IDENTIFIER "=" expr NEWLINE
+#              | IDENTIFIER ":" type "=" expr NEWLINE
+#              | stmt
+#   stmt       = "def" IDENTIFIER "(" [ param { "," param } ] ")" "->" type ":" NEWLINE block
+#              | "return" expr NEWLINE
+#              | "print" "(" expr ")" NEWLINE
+#              | "if" expr ":" NEWLINE block [ "else" ":" NEWLINE block ]
+#              | COMMENT NEWLINE
+#              | expr NEWLINE
+#   block      = INDENT { var_stmt } DEDENT
+#   param      = IDENTIFIER ":" type
+#   type       = "int" | "float" | "bool" | "str"
+#   expr       = comparison { ( "==" | "!=" ) comparison }
+#   comparison = term { ( ">" | ">=" | "<" | "<=" ) term }
+#   term       = factor { ( "+" | "-" ) factor }
+#   factor     = call { ( "*" | "/" ) call }
+#                (the four levels above are all parsed by `binary_expr` using PRECEDENCE)
+#   call       = primary { "(" [ expr { "," expr } ] ")" }
+#   primary    = IDENTIFIER | "(" expr ")" | INT | FLOAT | BOOL | STR
 class Parser:
     def __init__(self, tokens: list[Token]):
         self.position = 0
         self.tokens = tokens
-
-    def peek(self) -> Token:
-        return self.tokens[self.position]
-
-    def is_done(self):
-        return self.peek().kind == TokenKind.EOF
+        # NOTE: only the literals outside SMALL_LITERALS, the shared table is checked first rather than copied
+        self.literals: dict[tuple[type, object], Literal] = {}
 
     def check(self, kind: TokenKind):
-        if self.is_done():
-            return False
-        else:
-            return self.peek().kind == kind
+        current = self.tokens[self.position].kind
+        return current is kind and current is not EOF
 
     def previous(self):
         return self.tokens[self.position - 1]
 
-    def advance(self):
-        if not self.is_done():
+    # NOTE: fixed arity kind check for the hot call sites, it skips packing the kinds into a tuple
+    def match1(self, kind: TokenKind):
+        if self.tokens[self.position].kind is kind:
             self.position += 1
-        return self.previous()
+            return True
 
-    def match(self, *kinds: TokenKind):
-        for kind in kinds:
-            if self.check(kind):
-                self.advance()
-                return True
+        return False
+
+    def match_set(self, kinds: frozenset[TokenKind]):
+        if self.tokens[self.position].kind in kinds:
+            self.position += 1
+            return True
 
         return False
 
+    # NOTE: the hot helpers below keep the position in a local and store it back once
     def consume(self, kind: TokenKind):
-        if self.check(kind):
-            return self.advance()
+        position = self.position
+        token = self.tokens[position]
+
+        if token.kind is kind and kind is not EOF:
+            self.position = position + 1
+            return token
         else:
-            raise SyntaxError(f"Expected '{kind}', but got '{self.peek()}' instead")
+            raise SyntaxError(f"Expected '{kind}', but got '{token}' instead")
 
+    # NOTE: the tokenizer never emits two NEWLINEs in a row so there's at most one to skip
     def consume_empty_lines(self):
-        while self.match(TokenKind.NEWLINE):
-            ...
-
-    def number(self):
-        expr = None
-        if self.match(TokenKind.INT, TokenKind.FLOAT):
-            expr = Literal(self.previous().value)
+        if self.tokens[self.position].kind is NEWLINE:
+            self.position += 1
 
-        assert expr is not None
+    # NOTE: literals are never mutated after parsing so repeats of the same value share one node, the type is part
+    # of the key because 1, 1.0 and True all compare (and hash) equal
+    def literal(self, value: object) -> Literal:
+        if isinstance(value, str) and len(value) > MAX_INTERNED_STR:
+            return Literal(value)
+
+        # NOTE: 0.0 == -0.0 so they would share a key and print the same, zero floats are left unshared
+        if type(value) is float and value == 0:
+            return Literal(value)
+
+        key = (type(value), value)
+        literal = SMALL_LITERALS.get(key)
+        if literal is None:
+            literal = self.literals.get(key)
+            if literal is None:
+                literal = self.literals[key] = Literal(value)
+        return literal
+
+    # NOTE: operators on two literals are folded into a single literal, anything that would raise is left for the
+    # interpreter so the error still happens at run time (and only if that code actually runs)
+    def binary(self, left: Expr, op: Token, right: Expr) -> Expr:
+        expr = BinaryExpr(left, op, right)
+
+        if type(left) is Literal and type(right) is Literal:
+            try:
+                return self.literal(expr.handler(left.value, right.value))
+            except (ArithmeticError, TypeError):
+                pass
 
         return expr
 
     # NOTE: other compilers/interpreters can use "atomic" or "factor" for this
+    # NOTE: the expression rules run for every operand so they read the current token themselves rather than going
+    # through match1/previous, EOF just fails the kind checks
     def primary(self):
-        if self.match(TokenKind.IDENTIFIER):
-            return Var(self.previous())
-        elif self.match(TokenKind.LEFT_PAREN):
+        position = self.position
+        token = self.tokens[position]
+        kind = token.kind
+
+        if kind is IDENTIFIER:
+            self.position = position + 1
+            return Var(token)
+        elif kind is LEFT_PAREN:
+            self.position = position + 1
             expr = self.expr()
 
-            if not self.match(TokenKind.RIGHT_PAREN):
+            if not self.match1(RIGHT_PAREN):
                 raise SyntaxError("Expected ')' after expression")
 
-            return GroupingExpr(expr)
-        elif self.match(TokenKind.INT, TokenKind.FLOAT, TokenKind.BOOL, TokenKind.STR):
-            expr = Literal(self.previous().value)
+            # NOTE: the tree's shape already captures the grouping so there's no need for a GroupingExpr node
             return expr
+        elif kind in LITERAL_KINDS:
+            self.position = position + 1
+            return self.literal(token.value)
         else:
             raise Exception("Should be unreachable!")
 
-    def factor(self):
+    # NOTE: precedence climbing - one loop handles every binary operator level, the right operand is parsed at one
+    # level tighter than the operator so chains of the same precedence come out left associative
+    def binary_expr(self, min_precedence: int) -> Expr:
+        tokens = self.tokens
         expr = self.call_expr()
 
-        while self.match(TokenKind.STAR, TokenKind.SLASH):
-            op = self.previous()
-            right = self.factor()
-            expr = BinaryExpr(expr, op, right)
-
-        return expr
-
-    def term(self) -> Expr:
-        expr = self.factor()
-
-        while self.match(TokenKind.PLUS, TokenKind.MINUS):
-            op = self.previous()
-            right = self.factor()
-            expr = BinaryExpr(expr, op, right)
-
-        assert expr is not None
-
-        return expr
-
-    def comparison(self):
-        expr = self.term()
-
-        while self.match(
-            TokenKind.GREATER,
-            TokenKind.GREATER_EQUALS,
-            TokenKind.LESS,
-            TokenKind.LESS_EQUALS,
-        ):
-            op = self.previous()
-            right = self.term()
-            expr = BinaryExpr(expr, op, right)
-
-        return expr
-
-    def equality(self):
-        expr = self.comparison()
+        while True:
+            position = self.position
+            op = tokens[position]
+            precedence = PRECEDENCE.get(op.kind, 0)
+            if precedence < min_precedence:
+                break
 
-        while self.match(TokenKind.DOUBLE_EQUALS, TokenKind.NOT_EQUALS):
-            op = self.previous()
-            right = self.comparison()
-            expr = BinaryExpr(expr, op, right)
+            self.position = position + 1
+            right = self.binary_expr(precedence + 1)
+            expr = self.binary(expr, op, right)
 
         return expr
 
     def expr(self) -> Expr:
-        return self.equality()
+        return self.binary_expr(1)
 
     def print_stmt(self):
-        if not self.match(TokenKind.LEFT_PAREN):
+        if not self.match1(LEFT_PAREN):
             raise SyntaxError("Expected '(' after print")
 
         value = self.expr()
 
-        if not self.match(TokenKind.RIGHT_PAREN):
+        if not self.match1(RIGHT_PAREN):
             raise SyntaxError("Expected ')'")
 
-        if not self.match(TokenKind.NEWLINE):
+        if not self.match1(NEWLINE):
             raise SyntaxError("Expected newline after print statment")
 
         return PrintStmt(value)
 
+    # NOTE: looks one token past the identifier to pick the rule so nothing ever has to backtrack
     def var_stmt(self):
-        if self.match(TokenKind.IDENTIFIER):
-            if self.check(TokenKind.EQUALS):
-                name = self.previous()
-                _ = self.advance()
+        position = self.position
+        tokens = self.tokens
+
+        if tokens[position].kind is IDENTIFIER:
+            following = tokens[position + 1].kind
+
+            if following is EQUALS:
+                name = tokens[position]
+                self.position = position + 2
                 value = self.expr()
 
-                _ = self.consume(TokenKind.NEWLINE)
+                _ = self.consume(NEWLINE)
 
                 return AssignStmt(name, value)
-            elif self.check(TokenKind.COLON):
-                name = self.previous()
-
-                _ = self.advance()
+            elif following is COLON:
+                name = tokens[position]
+                self.position = position + 2
 
-                if not self.match(
-                    TokenKind.INT, TokenKind.FLOAT, TokenKind.STR, TokenKind.BOOL
-                ):
+                if not self.match_set(TYPE_KINDS):
                     raise SyntaxError("Expected type annotation")
 
                 type_annotation = self.previous()
 
-                if not self.match(TokenKind.EQUALS):
+                if not self.match1(EQUALS):
                     raise SyntaxError("Expected '=' after type annotation")
 
                 expr = self.expr()
 
-                _ = self.consume(TokenKind.NEWLINE)
+                _ = self.consume(NEWLINE)
 
                 return VarStmt(name, type_annotation, expr)
-            else:
-                # NOTE: I assume backtracking is bad and I should maybe check?
-                self.position -= 1
-                return self.stmt()
-        else:
-            return self.stmt()
+
+        return self.stmt()
 
     def if_stmt(self):
         cond = self.expr()
-        _ = self.consume(TokenKind.COLON)
-        _ = self.consume(TokenKind.NEWLINE)
+        _ = self.consume(COLON)
+        _ = self.consume(NEWLINE)
 
         if_branch = self.block_stmt()
 
         else_branch = None
-        if self.match(TokenKind.ELSE):
-            _ = self.consume(TokenKind.COLON)
-            _ = self.consume(TokenKind.NEWLINE)
+        if self.match1(TokenKind.ELSE):
+            _ = self.consume(COLON)
+            _ = self.consume(NEWLINE)
             else_branch = self.block_stmt()
 
         return IfStmt(cond, if_branch, else_branch)
 
     def expr_stmt(self):
         expr = self.expr()
-        _ = self.consume(TokenKind.NEWLINE)
+        _ = self.consume(NEWLINE)
         return ExprStmt(expr)
 
     def block_stmt(self):
@@ -427,109 +560,132 @@ class Parser:
 
         _ = self.consume(TokenKind.INDENT)
 
+        tokens = self.tokens
         stmts = []
+        append = stmts.append
 
-        while not self.check(TokenKind.DEDENT):
-            stmts.append(self.var_stmt())
-            self.consume_empty_lines()
+        # NOTE: `check` and `consume_empty_lines` inlined, this loop runs once per statement in every block
+        while tokens[self.position].kind is not DEDENT:
+            append(self.var_stmt())
+            if tokens[self.position].kind is NEWLINE:
+                self.position += 1
 
-        _ = self.consume(TokenKind.DEDENT)
+        _ = self.consume(DEDENT)
 
         self.consume_empty_lines()
 
         return BlockStmt(stmts)
 
+    # NOTE: the keyword is consumed here and the rule picked from STMT_RULES, anything else is an expression statement
     def stmt(self):
-        if self.match(TokenKind.DEF):
-            return self.function_stmt()
-        elif self.match(TokenKind.RETURN):
-            keyword = self.previous()
-            value = self.expr()
-            stmt = ReturnStmt(keyword, value)
-            _ = self.consume(TokenKind.NEWLINE)
-            return stmt
-        elif self.match(TokenKind.PRINT):
-            return self.print_stmt()
-        elif self.match(TokenKind.IF):
-            return self.if_stmt()
-        elif self.match(TokenKind.COMMENT):
-            stmt = CommentStmt(self.previous())
-            _ = self.consume(TokenKind.NEWLINE)
-            return stmt
-        else:
+        position = self.position
+        rule = STMT_RULES.get(self.tokens[position].kind)
+
+        if rule is None:
             return self.expr_stmt()
 
+        self.position = position + 1
+        return rule(self)
+
+    def return_stmt(self):
+        keyword = self.previous()
+        value = self.expr()
+        stmt = ReturnStmt(keyword, value)
+        _ = self.consume(NEWLINE)
+        return stmt
+
+    def comment_stmt(self):
+        stmt = CommentStmt(self.previous())
+        _ = self.consume(NEWLINE)
+        return stmt
+
     def function_stmt(self):
-        name = self.consume(TokenKind.IDENTIFIER)
+        name = self.consume(IDENTIFIER)
 
-        self.consume(TokenKind.LEFT_PAREN)
+        self.consume(LEFT_PAREN)
         params = []
 
-        if not self.check(TokenKind.RIGHT_PAREN):
+        if not self.check(RIGHT_PAREN):
             while True:
-                param_name = self.consume(TokenKind.IDENTIFIER)
-                _ = self.consume(TokenKind.COLON)
+                param_name = self.consume(IDENTIFIER)
+                _ = self.consume(COLON)
 
-                if not self.match(
-                    TokenKind.INT, TokenKind.FLOAT, TokenKind.STR, TokenKind.BOOL
-                ):
+                if not self.match_set(TYPE_KINDS):
                     raise SyntaxError()
 
                 param_type = self.previous()
 
                 params.append((param_name, param_type))
 
-                if not self.match(TokenKind.COMMA):
+                if not self.match1(TokenKind.COMMA):
                     break
 
-        self.consume(TokenKind.RIGHT_PAREN)
+        self.consume(RIGHT_PAREN)
         self.consume(TokenKind.ARROW)
 
-        if not self.match(
-            TokenKind.INT, TokenKind.FLOAT, TokenKind.BOOL, TokenKind.STR
-        ):
+        if not self.match_set(TYPE_KINDS):
             raise SyntaxError()
 
         return_type = self.previous()
 
-        self.consume(TokenKind.COLON)
-        self.consume(TokenKind.NEWLINE)
+        self.consume(COLON)
+        self.consume(NEWLINE)
 
         body = self.block_stmt()
 
         return FunctionStmt(name, params, return_type, body)
 
     def call_expr(self):
+        tokens = self.tokens
         expr = self.primary()
 
         while True:
-            if self.match(TokenKind.LEFT_PAREN):
-                arguments = []
-                if not self.check(TokenKind.RIGHT_PAREN):
-                    while True:
-                        arguments.append(self.expr())
-                        if not self.match(TokenKind.COMMA):
-                            break
-
-                _ = self.consume(TokenKind.RIGHT_PAREN)
-                expr = CallExpr(expr.name, arguments)
-            else:
+            position = self.position
+            if tokens[position].kind is not LEFT_PAREN:
                 break
 
+            self.position = position + 1
+            arguments = []
+            if tokens[position + 1].kind is not RIGHT_PAREN:
+                while True:
+                    arguments.append(self.expr())
+                    if not self.match1(TokenKind.COMMA):
+                        break
+
+            _ = self.consume(RIGHT_PAREN)
+            expr = CallExpr(expr.name, arguments)
+
         return expr
 
     def parse(self) -> list[Stmt]:
+        tokens = self.tokens
         stmts = []
+        append = stmts.append
 
         self.consume_empty_lines()
 
-        while not self.is_done():
-            stmts.append(self.var_stmt())
-            self.consume_empty_lines()
+        while tokens[self.position].kind is not EOF:
+            append(self.var_stmt())
+            if tokens[self.position].kind is NEWLINE:
+                self.position += 1
 
         return stmts
 
 
+# NOTE: like CPython's small int cache, these nodes are shared by every parse (there's no unary minus so nothing below 0)
+SMALL_LITERALS: dict[tuple[type, object], Literal] = {
+    (type(value), value): Literal(value) for value in [*range(257), True, False]
+}
+
+STMT_RULES: dict[TokenKind, Callable[[Parser], Stmt]] = {
+    TokenKind.DEF: Parser.function_stmt,
+    TokenKind.RETURN: Parser.return_stmt,
+    TokenKind.PRINT: Parser.print_stmt,
+    TokenKind.IF: Parser.if_stmt,
+    TokenKind.COMMENT: Parser.comment_stmt,
+}
+
+
 def parse(source: str):
     tokens = tokenize(source)
     parser = Parser(tokens)
@@ -537,38 +693,13 @@ def parse(source: str):
     return stmts
 
 
-class Evaluator(Visitor):
-    def evaluate(self, expr: Expr):
-        return expr.accept(self)
-
-    def visit_literal(self, expr: Literal):
-        return expr.value
-
-    def visit_grouping_expr(self, expr: GroupingExpr):
-        return self.evaluate(expr.expr)
-
-    def visit_binary_expr(self, expr: BinaryExpr):
-        left = self.evaluate(expr.left)
-        right = self.evaluate(expr.right)
-
-        kind = expr.op.kind
-
-        if kind == TokenKind.PLUS:
-            return left + right
-        elif kind == TokenKind.MINUS:
-            return left - right
-        elif kind == TokenKind.STAR:
-            return left * right
-        elif kind == TokenKind.SLASH:
-            return left / right
-        else:
-            return None
+def evaluate(source: str):
+    # NOTE: imported here since the compiler and VM are built on top of this module
+    from tinypy.compiler import compile_source_expression
+    from tinypy.vm import VM
 
+    code = compile_source_expression(source)
+    if code is None:
+        raise NotImplementedError(f"can't evaluate {source!r} outside a program")
 
-def evaluate(source: str):
-    tokens = tokenize(source)
-    parser = Parser(tokens)
-    expr = parser.expr()
-    evaluator = Evaluator()
-    result = evaluator.evaluate(expr)
-    return result
+    return VM().run(code)
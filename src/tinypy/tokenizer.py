@@ -1,54 +1,101 @@
-from enum import StrEnum
-from dataclasses import dataclass
-
-
-class TokenKind(StrEnum):
-    LEFT_PAREN = "("
-    RIGHT_PAREN = ")"
-    COLON = ":"
-    EQUALS = "="
-    DOUBLE_EQUALS = "=="
-    NOT_EQUALS = "!="
-    PLUS = "+"
-    STAR = "*"
-    SLASH = "/"
-    MINUS = "-"
-    LESS = "<"
-    LESS_EQUALS = "<="
-    GREATER = ">"
-    GREATER_EQUALS = ">="
-    ARROW = "->"
-    COMMA = ","
-
-    NEWLINE = "newline"
-    INDENT = "indent"
-    DEDENT = "dedent"
-
-    INT = "int"
-    FLOAT = "float"
-    STR = "str"
-
-    IF = "if"
-    ELIF = "elif"
-    ELSE = "else"
-
-    AND = "and"
-    OR = "or"
-    IS = "is"
-    NOT = "not"
-    NONE = "None"
-
-    PRINT = "print"
-
-    DEF = "def"
-    RETURN = "return"
-    IDENTIFIER = "identifier"
-
-    BOOL = "bool"
-
-    COMMENT = "comment"
-
-    EOF = "eof"
+import re
+from bisect import bisect_right
+from enum import IntEnum, auto
+from typing import Callable
+
+
+class TokenKind(IntEnum):
+    # NOTE: plain ints so kind checks are int compares, the source text for each kind lives in KIND_NAMES
+    LEFT_PAREN = 0
+    RIGHT_PAREN = auto()
+    COLON = auto()
+    EQUALS = auto()
+    DOUBLE_EQUALS = auto()
+    NOT_EQUALS = auto()
+    PLUS = auto()
+    STAR = auto()
+    SLASH = auto()
+    MINUS = auto()
+    LESS = auto()
+    LESS_EQUALS = auto()
+    GREATER = auto()
+    GREATER_EQUALS = auto()
+    ARROW = auto()
+    COMMA = auto()
+
+    NEWLINE = auto()
+    INDENT = auto()
+    DEDENT = auto()
+
+    INT = auto()
+    FLOAT = auto()
+    STR = auto()
+
+    IF = auto()
+    ELIF = auto()
+    ELSE = auto()
+
+    AND = auto()
+    OR = auto()
+    IS = auto()
+    NOT = auto()
+    NONE = auto()
+
+    PRINT = auto()
+
+    DEF = auto()
+    RETURN = auto()
+    IDENTIFIER = auto()
+
+    BOOL = auto()
+
+    COMMENT = auto()
+
+    EOF = auto()
+
+    def __str__(self) -> str:
+        return KIND_NAMES[self]
+
+
+KIND_NAMES = {
+    TokenKind.LEFT_PAREN: "(",
+    TokenKind.RIGHT_PAREN: ")",
+    TokenKind.COLON: ":",
+    TokenKind.EQUALS: "=",
+    TokenKind.DOUBLE_EQUALS: "==",
+    TokenKind.NOT_EQUALS: "!=",
+    TokenKind.PLUS: "+",
+    TokenKind.STAR: "*",
+    TokenKind.SLASH: "/",
+    TokenKind.MINUS: "-",
+    TokenKind.LESS: "<",
+    TokenKind.LESS_EQUALS: "<=",
+    TokenKind.GREATER: ">",
+    TokenKind.GREATER_EQUALS: ">=",
+    TokenKind.ARROW: "->",
+    TokenKind.COMMA: ",",
+    TokenKind.NEWLINE: "newline",
+    TokenKind.INDENT: "indent",
+    TokenKind.DEDENT: "dedent",
+    TokenKind.INT: "int",
+    TokenKind.FLOAT: "float",
+    TokenKind.STR: "str",
+    TokenKind.IF: "if",
+    TokenKind.ELIF: "elif",
+    TokenKind.ELSE: "else",
+    TokenKind.AND: "and",
+    TokenKind.OR: "or",
+    TokenKind.IS: "is",
+    TokenKind.NOT: "not",
+    TokenKind.NONE: "None",
+    TokenKind.PRINT: "print",
+    TokenKind.DEF: "def",
+    TokenKind.RETURN: "return",
+    TokenKind.IDENTIFIER: "identifier",
+    TokenKind.BOOL: "bool",
+    TokenKind.COMMENT: "comment",
+    TokenKind.EOF: "eof",
+}
 
 
 KEYWORDS = {
@@ -70,16 +117,54 @@ KEYWORDS = {
     "None": TokenKind.NONE,
 }
 
+# NOTE: the type names share their kind with literals of that type, everything else is fully described by its kind
+TYPE_KINDS = frozenset({TokenKind.INT, TokenKind.FLOAT, TokenKind.STR, TokenKind.BOOL})
+KEYWORD_KINDS = frozenset(KEYWORDS.values()) - TYPE_KINDS
+# NOTE: keywords are 2 to 6 characters so single letter names (`x`, `n`, `i`) and long names skip the dict lookup
+KEYWORD_LENGTHS = frozenset(len(text) for text in KEYWORDS)
+
+# NOTE: the regex engine scans a whole run in C rather than a Python loop per character
+SPACES_RE = re.compile(" *")
+# NOTE: the optional group is the fractional part including its point, a lone point is an error
+NUMBER_RE = re.compile(r"[0-9]+(\.[0-9]*)?")
+# NOTE: letters (any script) and underscores, no digits - `x1` is an identifier followed by a number
+IDENTIFIER_RE = re.compile(r"[^\W\d]+")
+
 
-@dataclass
+# NOTE: no `text` - identifiers/keywords carry their text as the value and punctuation is fully described by its kind
 class Token:
-    kind: TokenKind
-    line: int = -1
-    text: str = ""
-    value: object | None = None
+    __slots__ = ("kind", "line", "value")
+
+    def __init__(self, kind: TokenKind, line: int = -1, value: object | None = None):
+        self.kind = kind
+        self.line = line
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (
+            self.kind == other.kind
+            and self.line == other.line
+            and self.value == other.value
+        )
+
+    def __repr__(self) -> str:
+        # NOTE: punctuation and keywords are fully described by their kind, a type annotation's value is its name
+        if self.value is None or self.kind in KEYWORD_KINDS:
+            return str(self.kind)
+        if self.kind in TYPE_KINDS and self.value == str(self.kind):
+            return str(self.kind)
+        return f"{self.kind} {self.value}"
 
 
 INDENT_SPACES = 4
+# NOTE: INDENT_SPACES is a power of two so the level and remainder are a shift and a mask
+INDENT_SHIFT = INDENT_SPACES.bit_length() - 1
+INDENT_MASK = INDENT_SPACES - 1
+
+# NOTE: flip on to dump the token stream when the tokenizer hits something it can't handle
+DEBUG = False
 
 
 class Tokenizer:
@@ -87,184 +172,228 @@ class Tokenizer:
         # TODO: is this okay?
         if source[-1] != "\n":
             source += "\n"
-        self.source = source
+        # NOTE: the trailing "\0" sentinel means lookahead never has to bounds check
+        self.source = source + "\0"
+        self.end = len(source)
         self.position = 0
         self.start = 0
         self.line = 1
         self.tokens: list[Token] = []
-        self.character = self.source[self.position]
+        # NOTE: bound once so adding a token doesn't look up `tokens.append` every time
+        self.append = self.tokens.append
+        # NOTE: start as if we'd just seen a newline so the first line gets its indentation checked
+        self.last_kind = TokenKind.NEWLINE
+        self.punctuation: dict[TokenKind, Token] = {}
         self.indent_stack: list[int] = [0]
 
-    # NOTE: also seen this in various places as `consume`
-    def advance(self):
-        c = self.source[self.position]
-        self.position += 1
-        return c
-
-    # NOTE: peek **doesn't** consume the character
-    def peek(self):
-        if self.is_done():
-            return "\0"
-        else:
-            return self.source[self.position]
-
     def match(self, expected: str):
-        if self.is_done():
-            return False
-        elif self.source[self.position] != expected:
+        if self.source[self.position] != expected:
             return False
         else:
             self.position += 1
             return True
 
     def whitespace(self):
-        spaces = 0
-        while self.peek() == " ":
-            spaces += 1
-            self.advance()
+        source = self.source
+        start = self.position
+        position = self.position = SPACES_RE.match(source, start).end()
+        spaces = position - start
 
-        if self.peek() == "\t":
+        if source[position] == "\t":
             raise Exception(f"line {self.line}: tabs are currently forbidden in tinypy")
 
-        if len(self.tokens) > 0 and self.tokens[-1].kind != TokenKind.NEWLINE:
+        if self.last_kind is not TokenKind.NEWLINE:
             return
 
-        indent_level, rem = divmod(spaces, INDENT_SPACES)
-        assert rem == 0, "Invalid indent"
+        assert spaces & INDENT_MASK == 0, "Invalid indent"
+        indent_level = spaces >> INDENT_SHIFT
 
-        current_level = self.indent_stack[-1]
+        indent_stack = self.indent_stack
+        current_level = indent_stack[-1]
 
         if indent_level > current_level:
-            self.indent_stack.append(indent_level)
+            indent_stack.append(indent_level)
             self.add_token(TokenKind.INDENT)
         elif indent_level < current_level:
-            while indent_level < current_level:
-                self.indent_stack.pop()
-                self.add_token(TokenKind.DEDENT)
-                current_level = self.indent_stack[-1]
+            # NOTE: the stack is strictly increasing so everything after the bisect point gets closed
+            keep = bisect_right(indent_stack, indent_level)
+            dedent = Token(TokenKind.DEDENT, self.line)
+            self.tokens.extend([dedent] * (len(indent_stack) - keep))
+            self.last_kind = TokenKind.DEDENT
+            del indent_stack[keep:]
 
     def add_token(self, kind: TokenKind, value: object | None = None):
-        text = self.source[self.start : self.position]
-        token = Token(kind=kind, line=self.line, text=text, value=value)
-        self.tokens.append(token)
+        self.append(Token(kind, self.line, value))
+        self.last_kind = kind
 
-    def tokenize(self) -> list[Token]:
-        while True:
-            self.start = self.position
+    # NOTE: punctuation tokens carry nothing but their kind and line so share one instance per kind on each line
+    def add_punctuation(self, kind: TokenKind):
+        token = self.punctuation.get(kind)
+        if token is None:
+            token = self.punctuation[kind] = Token(kind, self.line)
+        self.append(token)
+        self.last_kind = kind
 
-            if len(self.tokens) == 0 or self.tokens[-1].kind == TokenKind.NEWLINE:
-                self.whitespace()
+    def tokenize(self) -> list[Token]:
+        source = self.source
+        tokens = self.tokens
+        dispatch = DISPATCH
 
-                self.start = self.position
+        # NOTE: indentation only matters at the start of a line so handle it once per line rather than checking on every token
+        while True:
+            self.whitespace()
 
             if self.is_done():
                 break
 
-            c = self.advance()
-
-            if c == "(":
-                self.add_token(TokenKind.LEFT_PAREN)
-            elif c == ")":
-                self.add_token(TokenKind.RIGHT_PAREN)
-            elif c == ":":
-                self.add_token(TokenKind.COLON)
-            elif c == "+":
-                self.add_token(TokenKind.PLUS)
-            elif c == "*":
-                self.add_token(TokenKind.STAR)
-            elif c == "/":
-                self.add_token(TokenKind.SLASH)
-            elif c == "<":
-                if self.match("="):
-                    self.add_token(TokenKind.LESS_EQUALS)
-                else:
-                    self.add_token(TokenKind.LESS)
-            elif c == ">":
-                if self.match("="):
-                    self.add_token(TokenKind.GREATER_EQUALS)
-                else:
-                    self.add_token(TokenKind.GREATER)
-            elif c == "#":
-                # swallow comments for now
-                while self.peek() != "\n" and not self.is_done():
-                    self.advance()
-                comment = self.source[self.start : self.position]
-                self.add_token(TokenKind.COMMENT, value=comment)
-            elif c == "\n":
-                # TODO: line number for new line??
-                self.add_token(TokenKind.NEWLINE)
-                self.line += 1
-            elif c == " ":
-                ...
-            elif c == "-":
-                if self.match(">"):
-                    self.add_token(TokenKind.ARROW)
-                else:
-                    self.add_token(TokenKind.MINUS)
-            elif c == "=":
-                if self.match("="):
-                    self.add_token(TokenKind.DOUBLE_EQUALS)
-                else:
-                    self.add_token(TokenKind.EQUALS)
-            elif c == "!":
-                if self.match("="):
-                    self.add_token(TokenKind.NOT_EQUALS)
-                else:
-                    raise Exception(f"line {self.line}: unexpected '!'")
-            elif c == '"':
-                while self.peek() != '"':
-                    self.advance()
-                self.advance()
-                text = self.source[self.start + 1 : self.position - 1]
-                self.add_token(TokenKind.STR, value=text)
-            elif c.isdigit():
-                while self.peek().isdigit():
-                    self.advance()
-
-                if self.peek() == ".":
-                    self.advance()  # consume the decimal point
-
-                    if not self.peek().isdigit():
-                        raise Exception(
-                            f"line {self.line}. Expected digit after decimal point"
-                        )
-
-                    while self.peek().isdigit():
-                        self.advance()
-
-                    text = self.source[self.start : self.position]
-
-                    value = float(text)
-
-                    self.add_token(TokenKind.FLOAT, value=value)
-                else:
-                    text = self.source[self.start : self.position]
-                    value = int(text)
-                    self.add_token(TokenKind.INT, value=value)
-            elif c.isalpha() or c == "_":
-                while self.peek().isalpha() or self.peek() == "_":
-                    self.advance()
-                text = self.source[self.start : self.position]
-                # NOTE: we can also produce the int/float type annotations here - they just will not be associated with a value unlike the literals
-                kind = KEYWORDS.get(text, TokenKind.IDENTIFIER)
-
-                if text in ("True", "False"):
-                    value = text == "True"
-                else:
-                    value = text
-
-                self.add_token(kind, value=value)
-            else:
-                # TODO: proper error handling
-                print(f"line {self.line} {self.tokens}")
-                raise Exception(f"Did not handle '{c}' in tokenize")
-
-        self.tokens.append(Token(kind=TokenKind.EOF, line=self.line))
-
-        return self.tokens
+            position = self.position
+            while (c := source[position]) != "\n":
+                # NOTE: spaces between tokens are the most common character and need no handler call
+                if c == " ":
+                    position += 1
+                    continue
+
+                self.start = position
+                self.position = position + 1
+
+                code = ord(c)
+                handler = dispatch[code] if code < 128 else Tokenizer.fallback
+
+                if handler is None:
+                    # TODO: proper error handling
+                    if DEBUG:
+                        print(f"line {self.line} {tokens}")
+                    raise Exception(
+                        f"line {self.line}: did not handle '{c}' in tokenize"
+                    )
+
+                handler(self)
+                position = self.position
+
+            self.start = position
+            self.position = position + 1
+            self.newline()
+
+        self.append(Token(TokenKind.EOF, self.line))
+
+        return tokens
+
+    def comment(self):
+        # swallow comments for now
+        # NOTE: the source always ends in a newline so this can't miss
+        self.position = self.source.index("\n", self.position)
+        comment = self.source[self.start : self.position]
+        self.add_token(TokenKind.COMMENT, value=comment)
+
+    def newline(self):
+        # TODO: line number for new line??
+        # NOTE: a run of blank lines collapses into a single NEWLINE so the parser never has to loop over them
+        if self.last_kind is not TokenKind.NEWLINE:
+            self.add_token(TokenKind.NEWLINE)
+        self.line += 1
+        self.punctuation.clear()
+
+    def bang(self):
+        if self.match("="):
+            self.add_punctuation(TokenKind.NOT_EQUALS)
+        else:
+            raise Exception(f"line {self.line}: unexpected '!'")
+
+    def string(self):
+        # NOTE: find the closing quote in C rather than a peek/advance call per character
+        try:
+            end = self.source.index('"', self.position)
+        except ValueError:
+            raise Exception(f"line {self.line}: unterminated string") from None
+        self.position = end + 1
+        text = self.source[self.start + 1 : end]
+        self.add_token(TokenKind.STR, value=text)
+
+    def number(self):
+        start = self.start
+        match = NUMBER_RE.match(self.source, start)
+        position = self.position = match.end()
+        fraction = match.group(1)
+
+        if fraction is None:
+            self.add_token(TokenKind.INT, value=int(self.source[start:position]))
+        elif len(fraction) == 1:
+            raise Exception(f"line {self.line}. Expected digit after decimal point")
+        else:
+            self.add_token(TokenKind.FLOAT, value=float(self.source[start:position]))
+
+    # NOTE: anything outside ASCII goes through here, the only thing it can start is an identifier
+    def fallback(self):
+        c = self.source[self.start]
+        if not c.isalpha():
+            raise Exception(f"line {self.line}: did not handle '{c}' in tokenize")
+        self.identifier()
+
+    def identifier(self):
+        match = IDENTIFIER_RE.match(self.source, self.start)
+        self.position = match.end()
+        text = match.group()
+        # NOTE: we can also produce the int/float type annotations here - they just will not be associated with a value unlike the literals
+        if len(text) in KEYWORD_LENGTHS:
+            kind = KEYWORDS.get(text, TokenKind.IDENTIFIER)
+        else:
+            kind = TokenKind.IDENTIFIER
+
+        if kind is TokenKind.BOOL and text != "bool":
+            value = text == "True"
+        else:
+            value = text
+
+        self.add_token(kind, value=value)
 
     def is_done(self):
-        return self.position >= len(self.source)
+        return self.position >= self.end
+
+
+def single(kind: TokenKind):
+    def handler(tokenizer: Tokenizer):
+        tokenizer.add_punctuation(kind)
+
+    return handler
+
+
+def one_or_two(kind: TokenKind, second: str, two_kind: TokenKind):
+    def handler(tokenizer: Tokenizer):
+        if tokenizer.match(second):
+            tokenizer.add_punctuation(two_kind)
+        else:
+            tokenizer.add_punctuation(kind)
+
+    return handler
+
+
+# NOTE: one slot per ASCII character so `tokenize` jumps straight to the handler instead of walking an if/elif chain
+DISPATCH: list[Callable[[Tokenizer], None] | None] = [None] * 128
+
+DISPATCH[ord("(")] = single(TokenKind.LEFT_PAREN)
+DISPATCH[ord(")")] = single(TokenKind.RIGHT_PAREN)
+DISPATCH[ord(":")] = single(TokenKind.COLON)
+DISPATCH[ord("+")] = single(TokenKind.PLUS)
+DISPATCH[ord("*")] = single(TokenKind.STAR)
+DISPATCH[ord("/")] = single(TokenKind.SLASH)
+DISPATCH[ord("<")] = one_or_two(TokenKind.LESS, "=", TokenKind.LESS_EQUALS)
+DISPATCH[ord(">")] = one_or_two(TokenKind.GREATER, "=", TokenKind.GREATER_EQUALS)
+DISPATCH[ord("-")] = one_or_two(TokenKind.MINUS, ">", TokenKind.ARROW)
+DISPATCH[ord("=")] = one_or_two(TokenKind.EQUALS, "=", TokenKind.DOUBLE_EQUALS)
+DISPATCH[ord("!")] = Tokenizer.bang
+DISPATCH[ord("#")] = Tokenizer.comment
+DISPATCH[ord('"')] = Tokenizer.string
+
+for code in range(ord("0"), ord("9") + 1):
+    DISPATCH[code] = Tokenizer.number
+
+for code in range(ord("a"), ord("z") + 1):
+    DISPATCH[code] = Tokenizer.identifier
+
+for code in range(ord("A"), ord("Z") + 1):
+    DISPATCH[code] = Tokenizer.identifier
+
+DISPATCH[ord("_")] = Tokenizer.identifier
 
 
 def tokenize(source: str):
@@ -0,0 +1,101 @@
+from typing import Any
+from tinypy.codegen import check_defined, check_undefined
+from tinypy.compiler import (
+    ADD,
+    ADD_CONST,
+    BINARY,
+    CHECK_DECLARE,
+    CHECK_STORE,
+    DECLARE,
+    DIV,
+    DIV_CONST,
+    JUMP,
+    JUMP_IF_FALSE,
+    LOAD_CONST,
+    LOAD_VAR,
+    MUL,
+    MUL_CONST,
+    POP,
+    PRINT,
+    STORE,
+    SUB,
+    SUB_CONST,
+    Code,
+)
+
+
+class VM:
+    def __init__(self):
+        self.values: dict[str, Any] = {}
+
+    # NOTE: one flat loop over the instruction array with everything it touches bound to locals, the if/elif is
+    # ordered roughly by how often each opcode runs and is cheaper than a call per instruction through a table
+    def run(self, code: Code) -> Any:
+        # NOTE: the array is the compact form to keep around, but indexing it boxes a fresh int on every read so the
+        # loop runs over a list copy instead
+        ops = code.ops.tolist()
+        consts = code.consts
+        names = code.names
+        values = self.values
+
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+
+        pc = 0
+        end = len(ops)
+
+        while pc < end:
+            op = ops[pc]
+            arg = ops[pc + 1]
+            pc += 2
+
+            if op == LOAD_CONST:
+                push(consts[arg])
+            elif op == LOAD_VAR:
+                try:
+                    push(values[names[arg]])
+                except KeyError:
+                    raise Exception(f"Variable {names[arg]} is not defined") from None
+            elif op == STORE or op == DECLARE:
+                values[names[arg]] = pop()
+            elif op == CHECK_STORE:
+                check_defined(values, names[arg])
+            elif op == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == DIV:
+                right = pop()
+                stack[-1] = stack[-1] / right
+            elif op == ADD_CONST:
+                stack[-1] = stack[-1] + consts[arg]
+            elif op == SUB_CONST:
+                stack[-1] = stack[-1] - consts[arg]
+            elif op == MUL_CONST:
+                stack[-1] = stack[-1] * consts[arg]
+            elif op == DIV_CONST:
+                stack[-1] = stack[-1] / consts[arg]
+            elif op == BINARY:
+                right = pop()
+                stack[-1] = consts[arg](stack[-1], right)
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == PRINT:
+                print(pop())
+            elif op == POP:
+                pop()
+            elif op == CHECK_DECLARE:
+                check_undefined(values, names[arg])
+            else:
+                raise Exception(f"unknown opcode {op}")
+
+        return stack[-1] if stack else None
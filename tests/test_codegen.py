@@ -0,0 +1,98 @@
+import math
+import pytest
+from tinypy.codegen import compile_expr, compile_function, compile_script
+from tinypy.parser import Parser, parse
+from tinypy.tokenizer import tokenize
+
+
+def parse_expr(source: str):
+    return Parser(tokenize(source)).expr()
+
+
+@pytest.mark.parametrize(
+    "source,values,expected",
+    [
+        ("10 + 1", {}, 11),
+        ("(10.7 + 3.1) * 2", {}, (10.7 + 3.1) * 2),
+        ("x * 2 - y", {"x": 4, "y": 1.5}, 6.5),
+        ("x < 3", {"x": 2}, True),
+        ('"x = " + x', {"x": True}, "x = True"),
+        ('"1" == 1', {}, True),
+    ],
+)
+def test_compile_expr(source: str, values: dict, expected):
+    compiled = compile_expr(parse_expr(source))
+    assert compiled is not None
+    assert compiled(values) == expected
+
+
+def test_compile_expr_non_finite_literals():
+    huge = "9" * 400 + ".0"
+    compiled = compile_expr(parse_expr(f"{huge} + x"))
+    assert compiled is not None
+    assert compiled({"x": 1}) == math.inf
+
+    compiled = compile_expr(parse_expr(f"{huge} - {huge}"))
+    assert compiled is not None
+    assert math.isnan(compiled({}))
+
+
+def test_compile_expr_rejects_calls():
+    assert compile_expr(parse_expr("f(1) + 1")) is None
+
+
+@pytest.mark.parametrize(
+    "source,args,expected",
+    [
+        ("def f(n: int) -> int:\n    return n * 2", {"n": 4}, 8),
+        (
+            "def f(n: int) -> int:\n    if n < 2:\n        return n\n    else:\n        # recurse\n        return n - 1",
+            {"n": 5},
+            4,
+        ),
+        (
+            'def f(s: str) -> str:\n    t: str = s + "!"\n    t = t + t\n    return t',
+            {"s": "a"},
+            "a!a!",
+        ),
+        ("def lambda(n: int) -> int:\n    return n + 1", {"n": 1}, 2),
+        ("def declare(n: int) -> int:\n    m: int = n * 3\n    return m", {"n": 2}, 6),
+    ],
+)
+def test_compile_function(source: str, args: dict, expected):
+    function = parse(source)[0]
+    compiled = compile_function(function)
+    assert compiled is not None
+    assert compiled(None, dict(args)) == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "def f(n: int) -> int:\n    if n < 2:\n        return n\n    print(n)",
+        "def f(n: int) -> int:\n    return n\n    print(n)",
+        "def f(n: int) -> int:\n    print(n)",
+    ],
+)
+def test_compile_function_requires_tail_returns(source: str):
+    assert compile_function(parse(source)[0]) is None
+
+
+def test_compile_script(capsys):
+    stmts = parse(
+        "x: int = 2\ndef f(n: int) -> int:\n    return n * x\nif x > 1:\n    print(f(x))"
+    )
+    script = compile_script(stmts)
+    assert script is not None
+
+    defined = []
+    values = {}
+    script(lambda name, *args: args[0] * values["x"], defined.append, values)
+
+    assert defined == [stmts[1]]
+    assert values == {"x": 2}
+    assert capsys.readouterr().out == "4\n"
+
+
+def test_compile_script_rejects_top_level_return():
+    assert compile_script(parse("return 1\nprint(2)")) is None
@@ -0,0 +1,59 @@
+import pytest
+from tinypy.inference import annotate
+from tinypy.parser import BINARY_OPS, COERCING_OPS, STRING_OPS, parse
+from tinypy.tokenizer import TokenKind
+
+
+# NOTE: a `return` doesn't end the function, so a later call or falling off the end changes what it gives back
+G = 'def g() -> str:\n    return "a"\n'
+
+
+@pytest.mark.parametrize(
+    "source,ops",
+    [
+        ("x: int = 1\nx + 2.5", BINARY_OPS),
+        ('x: bool = True\n"x = " + x', STRING_OPS),
+        ("y + 1", COERCING_OPS),
+        ("def f(n: int) -> int:\n    return n * 2\nf(1) * 2", COERCING_OPS),
+        ("def f(n: int) -> int:\n    return 2\nf(1) * 2", BINARY_OPS),
+        ('def f(n: int) -> int:\n    return "s"\nf(1) * 2', COERCING_OPS),
+        ('x: int = 1\nx = "s"\nx + 1', COERCING_OPS),
+        ("x: int = 1\nx = x * 2\nx + 1", BINARY_OPS),
+        ('if True:\n    y: str = "a"\nelse:\n    y: int = 1\ny + 1', COERCING_OPS),
+        ('x: int = 1\ny: int = x\nx = "s"\ny + 1', COERCING_OPS),
+        ('x: int = 1\ndef f() -> int:\n    x = "s"\n    return 1\nx + 1', BINARY_OPS),
+        (
+            G + "def h() -> int:\n    return 1\n    print(g())\nx: int = h()\nx + 1",
+            COERCING_OPS,
+        ),
+        (
+            'def g() -> int:\n    return 5\ndef h() -> str:\n    return "a"\n    print(g())\nh() + 1',
+            COERCING_OPS,
+        ),
+        ('def h() -> str:\n    print("x")\nh() + 1', COERCING_OPS),
+        (G + "def h() -> int:\n    print(g())\nh() * 3", COERCING_OPS),
+    ],
+)
+def test_annotate_picks_handler(source: str, ops):
+    stmts = parse(source)
+    annotate(stmts)
+    expr = stmts[-1].expr
+    assert expr.handler is ops[expr.op.kind]
+
+
+# NOTE: nothing checks the arguments a function is called with, so its parameters are unknown whatever the
+# annotation says
+def test_annotate_scopes_function_params():
+    stmts = parse('n: str = "a"\ndef f(n: int) -> int:\n    return n - 1\nn + 1')
+    annotate(stmts)
+    inner = stmts[1].body.stmts[0].value
+    assert inner.handler is COERCING_OPS[TokenKind.MINUS]
+    assert stmts[2].expr.handler is STRING_OPS[TokenKind.PLUS]
+
+
+def test_annotate_checks_function_locals():
+    source = 'x: int = 1\ndef f() -> int:\n    x = "s"\n    return x + 1\nf()'
+    stmts = parse(source)
+    annotate(stmts)
+    inner = stmts[1].body.stmts[1].value
+    assert inner.handler is COERCING_OPS[TokenKind.PLUS]
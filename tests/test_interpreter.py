@@ -1,5 +1,6 @@
 import pytest
-from tinypy.interpreter import interpret
+from tinypy.interpreter import Interpreter, interpret, prepare
+from tinypy.parser import parse
 
 
 @pytest.mark.parametrize(
@@ -12,7 +13,123 @@ from tinypy.interpreter import interpret
         "(10.7 + 3.1) * 2",
         "10.4 - 1\n(17.4 - 3) * 2",
         "print(10 + 1)\n6.7 - 1",
+        "x: int = 1\ndef f(n: int) -> int:\n    return n + x\nprint(f(f(1)))",
     ],
 )
 def test_interpret(source: str):
     interpret(source)
+
+
+def test_interpret_undefined_variable():
+    with pytest.raises(Exception, match="Variable y is not defined"):
+        interpret("x: int = 1\ny = 2")
+
+
+# NOTE: the name is checked before the value is evaluated so the call never prints
+@pytest.mark.parametrize(
+    "source,message",
+    [
+        ("x: int = 1\nx: int = f(2)", "x has already been defined"),
+        ("y = f(2)", "Variable y is not defined"),
+        (
+            "def g(n: int) -> int:\n    y = f(n)\n    return y\ng(2)",
+            "Variable y is not defined",
+        ),
+    ],
+)
+def test_interpret_checks_name_before_value(source: str, message: str, capsys):
+    function = "def f(n: int) -> int:\n    print(n)\n    return n\n"
+    with pytest.raises(Exception, match=message):
+        interpret(function + source)
+    assert capsys.readouterr().out == ""
+
+
+def test_interpret_reuses_prepared_source(capsys):
+    source = "x: int = 2\nprint(x * 3)"
+    interpret(source)
+    interpret(source)
+    assert capsys.readouterr().out == "6\n6\n"
+    assert prepare(source) is prepare(source)
+
+
+# NOTE: annotations aren't enforced so a value of another type has to keep the coercing operators
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        (
+            'c: bool = True\nif c:\n    y: str = "a"\nelse:\n    y: int = 1\nprint(y + 1)',
+            "a1\n",
+        ),
+        ('x: int = 1\nx = "s"\nprint(x + 1)', "s1\n"),
+        (
+            'x: int = 1\ndef f() -> int:\n    x = "s"\n    return 1\nf()\nprint(x + 1)',
+            "2\n",
+        ),
+    ],
+)
+def test_interpret_unchecked_annotations(source: str, expected: str, capsys):
+    interpret(source)
+    assert capsys.readouterr().out == expected
+
+
+# NOTE: a `return` doesn't end the function, so the declared return type can't be trusted unless it comes last
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        (
+            'def g() -> str:\n    return "a"\n'
+            "def h() -> int:\n    return 1\n    print(g())\nx: int = h()\nprint(x + 1)",
+            "a\na1\n",
+        ),
+        (
+            "def g() -> int:\n    return 5\n"
+            'def h() -> str:\n    return "a"\n    print(g())\nprint(h() + 1)',
+            "5\n6\n",
+        ),
+    ],
+)
+def test_interpret_unchecked_return_type(source: str, expected: str, capsys):
+    interpret(source)
+    assert capsys.readouterr().out == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        'def h() -> str:\n    print("x")\nprint(h() + 1)',
+        'def g() -> str:\n    return "a"\ndef h() -> int:\n    print(g())\nprint(h() * 3)',
+    ],
+)
+def test_interpret_missing_return(source: str):
+    with pytest.raises(TypeError):
+        interpret(source)
+
+
+def test_interpret_unchecked_parameter():
+    with pytest.raises(TypeError):
+        interpret('def f(a: int) -> int:\n    return a * 2\nprint(f("ab"))')
+
+
+def test_interpreter_compiles_repeated_trees(capsys):
+    stmts = parse(
+        "x: int = 3\ndef f(n: int) -> int:\n    print(n * 2)\nf(1)\nf(2)\nprint(x * 3)"
+    )
+    interpreter = Interpreter()
+    interpreter.interpret(stmts)
+    assert capsys.readouterr().out == "2\n4\n9\n"
+
+    inner = stmts[1].body.stmts[0].expr
+    assert interpreter.compiled[inner] is not None
+    assert stmts[4].expr not in interpreter.compiled
+
+
+def test_interpret_keeps_compiled_functions(capsys):
+    source = "def f(n: int) -> int:\n    return n * 2\nprint(f(2))"
+    interpret(source)
+    function = prepare(source)[0][0]
+    compiled = function.compiled
+    assert compiled is not None
+
+    interpret(source)
+    assert function.compiled is compiled
+    assert capsys.readouterr().out == "4\n4\n"
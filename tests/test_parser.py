@@ -1,5 +1,6 @@
 import pytest
 from tinypy.parser import parse, evaluate
+from tinypy.tokenizer import TokenKind
 
 
 @pytest.mark.parametrize(
@@ -10,9 +11,55 @@ from tinypy.parser import parse, evaluate
         "((10 + (1 + (1 + 10))))",
         "10 + 2.9 * 4 / 3.4 - 1.2 + 1",
         "(10.7 + 3.1) * 2",
+        "16 / 4 / 2",
+        "2 * 9 / 4 * 3",
+        "8 - 2 - 1",
+        "1 + 2 < 4",
+        "2 * 3 == 6",
+        "2 + 3 * 4 - 6 / 3 * 2 - 1",
     ],
 )
 def test_evaluate_arithmetic(source: str):
     actual = evaluate(source)
     expected = eval(source)
     assert actual == expected
+
+
+def test_parse_shares_repeated_literals():
+    stmts = parse("print(x + 1)\nprint(1 - x)\nprint(1.0 * True)")
+    one, also_one = stmts[0].expr.right, stmts[1].expr.left
+    assert one is also_one
+    assert stmts[2].expr.value == 1.0
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("2 * 3 + 1", 7),
+        ('"a" + 1 + 2', "a12"),
+        ("1 < 2 == True", True),
+    ],
+)
+def test_parse_folds_literal_operators(source: str, expected):
+    [stmt] = parse(source)
+    assert stmt.expr.value == expected
+
+
+def test_parse_keeps_signed_zeros_apart():
+    stmts = parse("print(0.0)\nprint((0 - 1) * 0.0)\nprint(0.0)")
+    assert [str(stmt.expr.value) for stmt in stmts] == ["0.0", "-0.0", "0.0"]
+
+
+def test_parse_leaves_failing_operators_to_run_time():
+    [stmt] = parse("x: int = 1 / 0")
+    assert stmt.expr.left.value == 1
+
+
+def test_parse_shares_small_ints_across_parses():
+    assert parse("print(x + 7)")[0].expr.right is parse("print(7 - y)")[0].expr.left
+
+
+def test_parse_drops_grouping():
+    [stmt] = parse("print((x + 1) * (2 + 3))")
+    assert stmt.expr.left.op.kind == TokenKind.PLUS
+    assert stmt.expr.right.value == 5
@@ -83,6 +83,70 @@ import pytest
                 Token(kind=TokenKind.EOF),
             ],
         ),
+        (
+            "x <= 1 >= 2 == 3 != 4 < 5 > 6",
+            [
+                Token(kind=TokenKind.IDENTIFIER, value="x"),
+                Token(kind=TokenKind.LESS_EQUALS),
+                Token(kind=TokenKind.INT, value=1),
+                Token(kind=TokenKind.GREATER_EQUALS),
+                Token(kind=TokenKind.INT, value=2),
+                Token(kind=TokenKind.DOUBLE_EQUALS),
+                Token(kind=TokenKind.INT, value=3),
+                Token(kind=TokenKind.NOT_EQUALS),
+                Token(kind=TokenKind.INT, value=4),
+                Token(kind=TokenKind.LESS),
+                Token(kind=TokenKind.INT, value=5),
+                Token(kind=TokenKind.GREATER),
+                Token(kind=TokenKind.INT, value=6),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.EOF),
+            ],
+        ),
+        (
+            "iffy def definitely nothing None",
+            [
+                Token(kind=TokenKind.IDENTIFIER, value="iffy"),
+                Token(kind=TokenKind.DEF, value="def"),
+                Token(kind=TokenKind.IDENTIFIER, value="definitely"),
+                Token(kind=TokenKind.IDENTIFIER, value="nothing"),
+                Token(kind=TokenKind.NONE, value="None"),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.EOF),
+            ],
+        ),
+        (
+            "if x:\n    if y:\n        z\nw",
+            [
+                Token(kind=TokenKind.IF, value="if"),
+                Token(kind=TokenKind.IDENTIFIER, value="x"),
+                Token(kind=TokenKind.COLON),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.INDENT),
+                Token(kind=TokenKind.IF, value="if"),
+                Token(kind=TokenKind.IDENTIFIER, value="y"),
+                Token(kind=TokenKind.COLON),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.INDENT),
+                Token(kind=TokenKind.IDENTIFIER, value="z"),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.DEDENT),
+                Token(kind=TokenKind.DEDENT),
+                Token(kind=TokenKind.IDENTIFIER, value="w"),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.EOF),
+            ],
+        ),
+        (
+            "\n\nx\n\n\ny\n",
+            [
+                Token(kind=TokenKind.IDENTIFIER, value="x"),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.IDENTIFIER, value="y"),
+                Token(kind=TokenKind.NEWLINE),
+                Token(kind=TokenKind.EOF),
+            ],
+        ),
     ],
 )
 def test_tokenizer(source, expected):
@@ -92,3 +156,67 @@ def test_tokenizer(source, expected):
     for token, expected_token in zip(tokens, expected):
         assert token.kind == expected_token.kind
         assert token.value == expected_token.value
+
+
+def test_token_kind_str():
+    assert str(TokenKind.LESS_EQUALS) == "<="
+    assert f"{TokenKind.NEWLINE}" == "newline"
+    assert TokenKind.PLUS == int(TokenKind.PLUS)
+
+
+def test_token_repr():
+    tokens = tokenize('x: int = 1 + "a"')
+    assert [repr(token) for token in tokens] == [
+        "identifier x",
+        ":",
+        "int",
+        "=",
+        "int 1",
+        "+",
+        "str a",
+        "newline",
+        "eof",
+    ]
+
+
+def test_token_repr_keyword_text():
+    tokens = tokenize('if x:\n    print("if" + "int")')
+    assert [repr(token) for token in tokens] == [
+        "if",
+        "identifier x",
+        ":",
+        "newline",
+        "indent",
+        "print",
+        "(",
+        "str if",
+        "+",
+        "str int",
+        ")",
+        "newline",
+        "dedent",
+        "eof",
+    ]
+
+
+def test_non_ascii_identifiers():
+    tokens = tokenize("café: int = naïve_x")
+    assert [(token.kind, token.value) for token in tokens] == [
+        (TokenKind.IDENTIFIER, "café"),
+        (TokenKind.COLON, None),
+        (TokenKind.INT, "int"),
+        (TokenKind.EQUALS, None),
+        (TokenKind.IDENTIFIER, "naïve_x"),
+        (TokenKind.NEWLINE, None),
+        (TokenKind.EOF, None),
+    ]
+
+
+def test_unhandled_non_ascii_character():
+    with pytest.raises(Exception, match="did not handle '€'"):
+        tokenize("x: int = €")
+
+
+def test_unterminated_string():
+    with pytest.raises(Exception, match="line 2: unterminated string"):
+        tokenize('x: str = "a"\ny: str = "b')
@@ -0,0 +1,102 @@
+import pytest
+from tinypy.compiler import compile_program, compile_source_expression
+from tinypy.inference import annotate
+from tinypy.interpreter import Interpreter
+from tinypy.parser import parse
+from tinypy.vm import VM
+
+
+def compile_source(source: str):
+    stmts = parse(source)
+    annotate(stmts)
+    return compile_program(stmts)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "print(10 + 2.9 * 4 / 3.4 - 1.2 + 1)",
+        "x: int = 3\ny: float = 1.5\nprint(x * y - 1)",
+        'name: str = "tiny"\nprint(name + 1)\nprint("1" == 1)',
+        "x: int = 1\nx = x + 1\nprint(x)",
+        "x: int = 3\nprint(x + 1)\nprint(x - 1.5)\nprint(x * 2 + x / 2)",
+        "x: int = 3\nif x < 2:\n    print(1)\nelse:\n    print(2)\nprint(3)",
+        "if True:\n    # nothing\n    print(1)\nif 1 > 2:\n    print(2)",
+    ],
+)
+def test_vm_matches_interpreter(source: str, capsys):
+    code = compile_source(source)
+    assert code is not None
+    VM().run(code)
+    actual = capsys.readouterr().out
+
+    Interpreter().interpret(parse(source))
+    expected = capsys.readouterr().out
+
+    assert actual == expected
+
+
+def test_compile_program_rejects_functions():
+    assert compile_source("def f(n: int) -> int:\n    return n\nprint(f(1))") is None
+
+
+@pytest.mark.parametrize(
+    "source,message",
+    [
+        ("x = 2", "Variable x is not defined"),
+        ("print(y + 1)", "Variable y is not defined"),
+        ("x: int = 1\nx: int = 2", "x has already been defined"),
+    ],
+)
+def test_vm_errors(source: str, message: str):
+    code = compile_source(source)
+    assert code is not None
+    with pytest.raises(Exception, match=message):
+        VM().run(code)
+
+
+# NOTE: the name is checked before the value is evaluated, like the interpreter does
+@pytest.mark.parametrize(
+    "source,message",
+    [
+        ("x: int = 1\nx: int = y", "x has already been defined"),
+        ("x = y", "Variable x is not defined"),
+    ],
+)
+def test_vm_checks_name_before_value(source: str, message: str):
+    code = compile_source(source)
+    assert code is not None
+    with pytest.raises(Exception, match=message):
+        VM().run(code)
+
+    with pytest.raises(Exception, match=message):
+        Interpreter().interpret(parse(source))
+
+
+def test_vm_long_program(capsys):
+    body = "if x < 100000:\n    x = x + 1\n" * 20000
+    code = compile_source("x: int = 0\n" + body + "print(x)")
+    assert code is not None
+    VM().run(code)
+    assert capsys.readouterr().out == "20000\n"
+
+
+def test_compile_source_expression_is_cached():
+    assert compile_source_expression("x * 2") is compile_source_expression("x * 2")
+
+
+def test_compile_program_pools_constants():
+    code = compile_source("x: int = 1\nx = x + 1\nprint(x == 1.0)\nprint(True)")
+    assert code is not None
+    assert [(type(c), c) for c in code.consts if not callable(c)] == [
+        (int, 1),
+        (float, 1.0),
+        (bool, True),
+    ]
+
+
+def test_compile_program_keeps_signed_zeros_apart(capsys):
+    code = compile_source("print(0.0)\nprint((0 - 1) * 0.0)\nprint(0.0)")
+    assert code is not None
+    VM().run(code)
+    assert capsys.readouterr().out == "0.0\n-0.0\n0.0\n"